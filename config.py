@@ -1,6 +1,7 @@
 from datetime import datetime, timedelta
 import os
 from pathlib import Path
+from typing import NamedTuple, Tuple
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -14,26 +15,53 @@ RSS_FEEDS = [
 ]
 
 # Date Configuration
-DEFAULT_START_DATE = datetime.now() - timedelta(days=7)  # Last 7 days
-DEFAULT_END_DATE = datetime.now()
+def default_date_range() -> Tuple[datetime, datetime]:
+    """Return a fresh (start, end) range covering the last 7 days."""
+    end_date = datetime.now()
+    return end_date - timedelta(days=7), end_date
 
 # Storage Configuration
 STORAGE_DIR = Path(os.getenv('STORAGE_DIR', 'storage'))
 PROCESSED_ARTICLES_DIR = STORAGE_DIR / "processed_articles"
 RAW_ARTICLES_DIR = STORAGE_DIR / "raw_articles"
+TOKEN_CACHE_FILE = STORAGE_DIR / "token_counts.json"
+FEED_STATE_FILE = STORAGE_DIR / "feed_state.json"
 
 # Content Analysis Configuration
 MIN_ARTICLE_LENGTH = int(os.getenv('MIN_ARTICLE_LENGTH', '100'))  # Minimum number of words for analysis
 MAX_ARTICLES_PER_FEED = int(os.getenv('MAX_ARTICLES_PER_FEED', '50'))  # Maximum number of articles to process per feed
+MAX_ARTICLE_WORDS = int(os.getenv('MAX_ARTICLE_WORDS', '0'))  # Stop collecting article text after this many words (0 = no limit)
 
-# Create necessary directories
-for directory in [STORAGE_DIR, PROCESSED_ARTICLES_DIR, RAW_ARTICLES_DIR]:
-    directory.mkdir(parents=True, exist_ok=True)
+# Fetch Configuration
+MAX_FETCH_WORKERS = int(os.getenv('MAX_FETCH_WORKERS', '8'))  # Number of articles fetched concurrently
+MAX_ARTICLE_BYTES = int(os.getenv('MAX_ARTICLE_BYTES', str(2 * 1024 * 1024)))  # Maximum number of bytes read per article page
+MAX_REQUESTS_PER_HOST = int(os.getenv('MAX_REQUESTS_PER_HOST', '4'))  # Concurrent requests allowed to a single host, below MAX_FETCH_WORKERS
+RATE_LIMIT_RETRIES = int(os.getenv('RATE_LIMIT_RETRIES', '3'))  # Retries after a 429/503 response
+RATE_LIMIT_BASE_DELAY = float(os.getenv('RATE_LIMIT_BASE_DELAY', '1.0'))  # Seconds before the first retry
+RATE_LIMIT_MAX_DELAY = float(os.getenv('RATE_LIMIT_MAX_DELAY', '60.0'))  # Upper bound for a single retry delay
+
+# Storage Write Configuration
+ARTICLE_FLUSH_EVERY = int(os.getenv('ARTICLE_FLUSH_EVERY', '50'))  # Number of articles written between file flushes
+
+# Tokenization Cache Configuration
+MAX_CACHED_TEXT_LENGTH = int(os.getenv('MAX_CACHED_TEXT_LENGTH', '100000'))  # Longer texts are tokenized without caching
+MAX_TOKEN_CACHE_ENTRIES = int(os.getenv('MAX_TOKEN_CACHE_ENTRIES', '2000'))  # Token counts kept across runs, most recently used first
+
+def ensure_dirs():
+    """Create the storage directories if they don't exist yet."""
+    for directory in [STORAGE_DIR, PROCESSED_ARTICLES_DIR, RAW_ARTICLES_DIR]:
+        directory.mkdir(parents=True, exist_ok=True)
 
 # Analysis Parameters
-ANALYSIS_CONFIG = {
-    "extract_keywords": os.getenv('EXTRACT_KEYWORDS', 'True').lower() == 'true',
-    "summarize_content": os.getenv('SUMMARIZE_CONTENT', 'True').lower() == 'true',
-    "extract_entities": os.getenv('EXTRACT_ENTITIES', 'True').lower() == 'true',
-    "sentiment_analysis": os.getenv('SENTIMENT_ANALYSIS', 'True').lower() == 'true'
-} 
\ No newline at end of file
+class AnalysisConfig(NamedTuple):
+    extract_keywords: bool
+    summarize_content: bool
+    extract_entities: bool
+    sentiment_analysis: bool
+
+ANALYSIS_CONFIG = AnalysisConfig(
+    extract_keywords=os.getenv('EXTRACT_KEYWORDS', 'True').lower() == 'true',
+    summarize_content=os.getenv('SUMMARIZE_CONTENT', 'True').lower() == 'true',
+    extract_entities=os.getenv('EXTRACT_ENTITIES', 'True').lower() == 'true',
+    sentiment_analysis=os.getenv('SENTIMENT_ANALYSIS', 'True').lower() == 'true'
+) 
\ No newline at end of file
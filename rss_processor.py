@@ -1,23 +1,55 @@
 import feedparser
 import json
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+import calendar
+import functools
+import hashlib
+import queue
+import random
+import re
+import threading
+import time
+from datetime import date, datetime, timedelta
+from email.utils import parsedate_to_datetime
 from pathlib import Path
 import logging
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit
 import nltk
+from nltk.tokenize import NLTKWordTokenizer
 from bs4 import BeautifulSoup
+from lxml import etree, html
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from dateutil import parser
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from config import (
     RSS_FEEDS,
-    DEFAULT_START_DATE,
-    DEFAULT_END_DATE,
     PROCESSED_ARTICLES_DIR,
     RAW_ARTICLES_DIR,
+    TOKEN_CACHE_FILE,
+    FEED_STATE_FILE,
     MIN_ARTICLE_LENGTH,
     MAX_ARTICLES_PER_FEED,
-    ANALYSIS_CONFIG
+    MAX_ARTICLE_WORDS,
+    MAX_FETCH_WORKERS,
+    MAX_ARTICLE_BYTES,
+    MAX_REQUESTS_PER_HOST,
+    RATE_LIMIT_RETRIES,
+    RATE_LIMIT_BASE_DELAY,
+    RATE_LIMIT_MAX_DELAY,
+    MAX_CACHED_TEXT_LENGTH,
+    MAX_TOKEN_CACHE_ENTRIES,
+    ARTICLE_FLUSH_EVERY,
+    ANALYSIS_CONFIG,
+    ensure_dirs
 )
 
 # Set up logging
@@ -27,15 +59,356 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _parse_html(markup: str) -> BeautifulSoup:
+    """Parse HTML with lxml, falling back to html.parser if lxml fails."""
+    try:
+        return BeautifulSoup(markup, 'lxml')
+    except Exception as e:
+        logger.debug("lxml parser failed, falling back to html.parser: %s", e)
+        return BeautifulSoup(markup, 'html.parser')
+
+# Headers sent with every request made through the shared session
+_HTTP_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+    'Accept-Language': 'en-US,en;q=0.5',
+    'Connection': 'keep-alive',
+    'Upgrade-Insecure-Requests': '1'
+}
+
+# Common content selectors for news websites, as (tag, attributes) in priority order
+_CONTENT_SELECTORS = (
+    # Article content selectors
+    ('article', {'class': 'article-content'}),
+    ('article', {'class': 'content'}),
+    ('article', {'class': 'post-content'}),
+    ('article', {'class': 'entry-content'}),
+    ('article', {'class': 'article-body'}),
+    ('article', {'class': 'story-content'}),
+
+    # Div content selectors
+    ('div', {'class': 'article-content'}),
+    ('div', {'class': 'content'}),
+    ('div', {'class': 'post-content'}),
+    ('div', {'class': 'entry-content'}),
+    ('div', {'class': 'article-body'}),
+    ('div', {'class': 'story-content'}),
+    ('div', {'class': 'article-text'}),
+    ('div', {'class': 'article-main'}),
+    ('div', {'class': 'main-content'}),
+
+    # Specific RTVDrenthe selectors
+    ('div', {'class': 'layout-components-group article-content', 'data-v-28650198': ''}),
+    ('div', {'class': 'layout-components-group article-content'}),
+
+    # Generic content containers
+    ('main', {}),
+    ('article', {}),
+    ('div', {'id': 'content'}),
+    ('div', {'id': 'article-content'}),
+    ('div', {'id': 'main-content'})
+)
+
+def _selector_xpath(tag: str, attrs: Dict[str, str], axis: str = '//') -> str:
+    """Translate a (tag, attributes) selector into an XPath expression."""
+    predicates = []
+    for name, value in attrs.items():
+        if name == 'class' and ' ' not in value:
+            # Match a single class token, like BeautifulSoup's class_ filter
+            predicates.append(f"[contains(concat(' ', normalize-space(@class), ' '), ' {value} ')]")
+        elif name == 'class':
+            predicates.append(f"[normalize-space(@class)='{value}']")
+        else:
+            predicates.append(f"[@{name}='{value}']")
+    return f"{axis}{tag}{''.join(predicates)}"
+
+# All selectors as one union, so the page is searched in a single pass
+_CONTENT_CANDIDATES_XPATH = etree.XPath(' | '.join(
+    _selector_xpath(tag, attrs) for tag, attrs in _CONTENT_SELECTORS
+))
+
+# Per-selector tests against a single candidate node, used to restore priority order
+_CONTENT_MATCHERS = tuple(
+    (tag, attrs, etree.XPath(f"boolean({_selector_xpath(tag, attrs, axis='self::')})"))
+    for tag, attrs in _CONTENT_SELECTORS
+)
+
+def _find_content(document: html.HtmlElement) -> Optional[Tuple[html.HtmlElement, str, Dict[str, str]]]:
+    """Find the highest-priority content container on a page.
+
+    Returns the element with the selector that matched it, or None.
+    """
+    candidates = _CONTENT_CANDIDATES_XPATH(document)
+    if not candidates:
+        return None
+    # The union returns nodes in document order; pick by selector priority instead
+    for tag, attrs, matches in _CONTENT_MATCHERS:
+        for candidate in candidates:
+            if matches(candidate):
+                return candidate, tag, attrs
+    return None
+
+# Tags that never hold article text
+_STRIP_TAGS = (
+    'script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe',
+    'noscript', 'form', 'button', 'input', 'select', 'textarea'
+)
+
+# Elements whose class names mark common non-content blocks
+_NON_CONTENT_XPATH = etree.XPath(
+    './/*[' + ' or '.join(
+        f"contains(translate(@class, 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), '{class_name}')"
+        for class_name in ['advertisement', 'social-share', 'related-articles', 'news-category-list', 'comments', 'sidebar']
+    ) + ']'
+)
+
+# Runs of whitespace, collapsed to a single space in extracted text
+_WS_RE = re.compile(r'\s+')
+
+# Elements whose text makes up the article body. Divs only count when they
+# hold no other text elements, so nested text is not collected twice
+_TEXT_TAGS = ('p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li')
+_TEXT_XPATH = etree.XPath(' | '.join(
+    [f'.//{tag}' for tag in _TEXT_TAGS] +
+    [f".//div[not({' or '.join(f'.//{tag}' for tag in _TEXT_TAGS + ('div',))})]"]
+))
+
+def _read_capped(response: requests.Response, limit: int, chunk_size: int = 64 * 1024) -> bytes:
+    """Read at most ``limit`` decoded bytes from a streamed response.
+
+    Reading stops as soon as the limit is reached, so the rest of an
+    oversized page is never downloaded.
+    """
+    chunks = []
+    size = 0
+    for chunk in response.iter_content(chunk_size):
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= limit:
+            break
+    return b''.join(chunks)[:limit]
+
+def _parse_document(body: bytes, response: requests.Response) -> html.HtmlElement:
+    """Parse page bytes, honouring a charset declared in the HTTP headers.
+
+    Without a declared charset lxml detects the encoding from the page's
+    meta tags, so the body never has to be decoded to a str first. The same
+    detection is used when lxml does not know the declared charset.
+    """
+    content_type = response.headers.get('Content-Type', '').lower()
+    encoding = response.encoding if 'charset=' in content_type else None
+    try:
+        parser = html.HTMLParser(encoding=encoding)
+    except LookupError:
+        logger.debug("Unknown charset %r, detecting the encoding instead", encoding)
+        parser = html.HTMLParser()
+    return html.fromstring(body, parser=parser)
+
+# Responses that mean the host wants us to slow down
+_RATE_LIMIT_STATUSES = (429, 503)
+
+def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+    """Return how long the server asked us to wait, if it said so."""
+    retry_after = response.headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            try:
+                return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+            except (TypeError, ValueError):
+                pass
+    reset = response.headers.get('X-RateLimit-Reset')
+    if reset:
+        try:
+            # Usually an epoch timestamp; small values are a delay in seconds
+            reset_value = float(reset)
+        except ValueError:
+            return None
+        return max(0.0, reset_value - time.time()) if reset_value > 1e9 else reset_value
+    return None
+
+def _link_key(link: str) -> Tuple[str, str, str]:
+    """Normalize an article URL for duplicate detection.
+
+    The query is part of the key, since many sites identify articles by it
+    (e.g. ``?p=123``); only ``utm_*`` tracking parameters and the fragment
+    are ignored.
+    """
+    parts = urlsplit(link)
+    query = urlencode([
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not name.lower().startswith('utm_')
+    ])
+    return parts.netloc.lower(), parts.path.rstrip('/'), query
+
+def _rss_content(article: Dict) -> str:
+    """Return the content embedded in the RSS entry itself."""
+    if 'content' in article:
+        return article.content[0].value
+    elif 'summary' in article:
+        return article.summary
+    elif 'description' in article:
+        return article.description
+    return ""
+
+# Word tokenizer used by nltk.word_tokenize, built once instead of per call
+_WORD_TOKENIZER = NLTKWordTokenizer()
+
+@functools.lru_cache(maxsize=8)
+def _get_sent_tokenizer(language: str = 'english'):
+    """Load the Punkt sentence tokenizer for a language once and reuse it."""
+    return nltk.data.load(f'tokenizers/punkt/{language}.pickle')
+
+# Plain word pattern, enough for length statistics when no entity extraction needs Treebank tokens
+_WORD_RE = re.compile(r'\w+')
+
+def _tokenize(content: str, treebank_words: bool = True) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Split content into sentences and words with a single Punkt pass.
+
+    With ``treebank_words`` false, words are matched with a regex instead of
+    the Treebank tokenizer, which is much faster but drops punctuation tokens.
+    """
+    sentences = tuple(_get_sent_tokenizer().tokenize(content))
+    if treebank_words:
+        words = tuple(token for sentence in sentences for token in _WORD_TOKENIZER.tokenize(sentence))
+    else:
+        words = tuple(_WORD_RE.findall(content))
+    return sentences, words
+
+def _token_stats(content: str, treebank_words: bool = True) -> Tuple[int, int, int]:
+    """Return the sentence, word and unique alphabetic word counts of content."""
+    sentences, words = _tokenize(content, treebank_words)
+    unique_words = len({word.casefold() for word in words if word.isalpha()})
+    return len(sentences), len(words), unique_words
+
+def _dump_line(article_data: Dict) -> bytes:
+    """Serialize an article as a single NDJSON line."""
+    if orjson is not None:
+        return orjson.dumps(article_data, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(article_data, ensure_ascii=False) + '\n').encode('utf-8')
+
+def _load_line(line: bytes) -> Dict:
+    """Deserialize a single NDJSON line."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+class ArticleWriter:
+    """Append articles to a JSONL file from a dedicated writer thread.
+
+    Producers only enqueue articles. A single thread serializes them and
+    appends to one file handle kept open for the whole run, so writes never
+    interleave and callers never wait on disk I/O. The file is flushed every
+    ``flush_every`` articles and on ``flush()`` / ``close()``.
+    """
+
+    # Queue marker asking the writer thread to flush the file
+    _FLUSH = object()
+
+    def __init__(self, path: Path, flush_every: int = ARTICLE_FLUSH_EVERY):
+        self.path = path
+        self.flush_every = max(1, flush_every)
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def write(self, article_data: Dict):
+        """Queue an article for writing."""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._writer_loop, name='article-writer', daemon=True)
+                self._thread.start()
+        self._queue.put(article_data)
+
+    def flush(self):
+        """Block until every queued article has been written to disk."""
+        if self._thread is not None:
+            self._queue.put(self._FLUSH)
+            self._queue.join()
+
+    def close(self):
+        """Write the remaining articles and stop the writer thread."""
+        with self._lock:
+            thread, self._thread = self._thread, None
+        if thread is not None:
+            self._queue.put(None)
+            thread.join()
+
+    def _writer_loop(self):
+        try:
+            f = open(self.path, 'ab')
+        except OSError as e:
+            logger.error(f"Error opening articles file {self.path}: {str(e)}")
+            f = None
+
+        unflushed = 0
+        while True:
+            article_data = self._queue.get()
+            try:
+                if article_data is None:
+                    break
+                if f is None:
+                    continue
+                if article_data is not self._FLUSH:
+                    f.write(_dump_line(article_data))
+                    unflushed += 1
+                if unflushed and (unflushed >= self.flush_every or article_data is self._FLUSH):
+                    f.flush()
+                    logger.debug("Wrote %d articles to: %s", unflushed, self.path.name)
+                    unflushed = 0
+            except Exception as e:
+                logger.error(f"Error writing article: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+        if f is not None:
+            f.close()
+
 class RSSProcessor:
     def __init__(self):
+        ensure_dirs()
         self.feeds = RSS_FEEDS
         # Set date range to yesterday
         self.end_date = datetime.now()
         self.start_date = self.end_date - timedelta(days=1)
+        self._yesterday = self.start_date.date()
+
+        # Articles file for this run, named once so a run never spans files
+        self.writer = ArticleWriter(PROCESSED_ARTICLES_DIR / f"articles_{self.end_date.strftime('%Y%m%d')}.jsonl")
         
         logger.info(f"Initializing RSS Processor with {len(self.feeds)} feeds")
         logger.info(f"Date range: {self.start_date} to {self.end_date}")
+
+        # Shared HTTP session so article fetches reuse pooled keep-alive connections
+        self.session = requests.Session()
+        self.session.headers.update(_HTTP_HEADERS)
+        # 429/503 are left to http_get, which honours Retry-After per host;
+        # the pool is never smaller than the worker count so connections are kept
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=max(64, MAX_FETCH_WORKERS),
+            max_retries=Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=[500, 502, 504],
+                raise_on_status=False
+            )
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        # Per-host concurrency limits, created on first request to each host
+        self._host_semaphores: Dict[str, threading.Semaphore] = {}
+        self._host_semaphores_lock = threading.Lock()
+
+        # Tokenization results from previous runs, keyed by content hash
+        self._token_cache = self._load_token_cache()
+        self._token_cache_used = {}
+
+        # ETag / Last-Modified per feed URL for conditional requests
+        self._feed_state = self._load_feed_state()
+        self._pending_feed_state: Dict[str, Dict[str, str]] = {}
         
         # Download required NLTK data
         try:
@@ -49,46 +422,218 @@ class RSSProcessor:
             nltk.download('words')
             logger.info("NLTK data downloaded successfully")
 
+        # Load the tokenizers now rather than inside the first article's analysis
+        try:
+            _tokenize("Warm up.")
+        except Exception as e:
+            logger.error(f"Error loading NLTK tokenizers: {str(e)}")
+
+    def _article_day(self, article: Dict) -> Optional[date]:
+        """Return the local calendar day an article was published on, if known."""
+        # Prefer the struct_time feedparser already parsed over re-parsing the string;
+        # it is in UTC, so convert it to local time like ``self._yesterday``
+        parsed = article.get('published_parsed') or article.get('updated_parsed')
+        if parsed:
+            return datetime.fromtimestamp(calendar.timegm(parsed)).date()
+
+        # Try to get the published date from various possible fields
+        pub_date = article.get('published', article.get('pubDate', article.get('updated')))
+        if not pub_date:
+            return None
+
+        # Parse the date string, moving offset-aware values to local time
+        published = parser.parse(pub_date)
+        if published.tzinfo is not None:
+            published = published.astimezone()
+        return published.date()
+
     def is_article_from_yesterday(self, article: Dict) -> bool:
         """Check if an article was published yesterday."""
         try:
-            # Try to get the published date from various possible fields
-            pub_date = article.get('published', article.get('pubDate', article.get('updated')))
-            if not pub_date:
+            article_day = self._article_day(article)
+            if article_day is None:
                 logger.warning(f"No publication date found for article: {article.get('title', 'Unknown title')}")
                 return False
-
-            # Parse the date string
-            article_date = parser.parse(pub_date)
-            
-            # Convert to datetime if it's a date object
-            if not isinstance(article_date, datetime):
-                article_date = datetime.combine(article_date, datetime.min.time())
             
             # Check if the article is from yesterday
-            is_yesterday = (
-                article_date.date() == self.start_date.date() and
-                self.start_date.date() <= article_date.date() <= self.end_date.date()
-            )
+            is_yesterday = article_day == self._yesterday
             
             if is_yesterday:
-                logger.info(f"Found yesterday's article: {article.get('title', 'Unknown title')} from {article_date}")
+                logger.info("Found yesterday's article: %s from %s", article.get('title', 'Unknown title'), article_day)
             else:
-                logger.debug(f"Article not from yesterday: {article.get('title', 'Unknown title')} from {article_date}")
+                logger.debug("Article not from yesterday: %s from %s", article.get('title', 'Unknown title'), article_day)
             
             return is_yesterday
         except Exception as e:
             logger.error(f"Error parsing date for article: {str(e)}")
             return False
 
+    def _load_feed_state(self) -> Dict[str, Dict[str, str]]:
+        """Load the persisted ETag / Last-Modified values and target day of each feed."""
+        if not FEED_STATE_FILE.exists():
+            return {}
+        try:
+            with open(FEED_STATE_FILE, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Error reading feed state {FEED_STATE_FILE}: {str(e)}")
+            return {}
+
+    def _save_feed_state(self):
+        """Persist the ETag / Last-Modified values of each feed."""
+        try:
+            with open(FEED_STATE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(self._feed_state, f, indent=2)
+        except Exception as e:
+            logger.error(f"Error saving feed state: {str(e)}")
+
+    def _load_token_cache(self) -> Dict[str, Tuple[int, int, int]]:
+        """Load the persisted token counts, if any."""
+        if not TOKEN_CACHE_FILE.exists():
+            return {}
+        try:
+            with open(TOKEN_CACHE_FILE, 'r', encoding='utf-8') as f:
+                cache = {key: tuple(stats) for key, stats in json.load(f).items()}
+            logger.info(f"Loaded {len(cache)} cached token counts")
+            return cache
+        except Exception as e:
+            logger.warning(f"Error reading token count cache {TOKEN_CACHE_FILE}: {str(e)}")
+            return {}
+
+    def _save_token_cache(self):
+        """Merge this run's token counts into the persisted cache."""
+        if not self._token_cache_used:
+            logger.info("No token counts used in this run, keeping existing cache")
+            return
+
+        # Entries used in this run go last, so trimming drops the stalest ones first
+        merged = {key: stats for key, stats in self._token_cache.items() if key not in self._token_cache_used}
+        merged.update(self._token_cache_used)
+        if len(merged) > MAX_TOKEN_CACHE_ENTRIES:
+            merged = dict(list(merged.items())[-MAX_TOKEN_CACHE_ENTRIES:])
+
+        try:
+            with open(TOKEN_CACHE_FILE, 'w', encoding='utf-8') as f:
+                json.dump(merged, f)
+            logger.info(f"Saved {len(merged)} cached token counts")
+        except Exception as e:
+            logger.error(f"Error saving token count cache: {str(e)}")
+
+    def tokenize_content(self, content: str) -> Tuple[int, int, int]:
+        """Count sentences, words and unique words, reusing results for content seen before."""
+        # Only entity extraction needs full Treebank word tokens
+        treebank_words = ANALYSIS_CONFIG.extract_entities
+        if len(content) > MAX_CACHED_TEXT_LENGTH:
+            return _token_stats(content, treebank_words)
+
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=16).hexdigest()
+        key = f"{'treebank' if treebank_words else 'regex'}:{digest}"
+        stats = self._token_cache_used.get(key) or self._token_cache.get(key)
+        if stats is None:
+            stats = _token_stats(content, treebank_words)
+        self._token_cache_used[key] = stats
+        return stats
+
+    def close(self):
+        """Stop the article writer and close the shared HTTP session."""
+        self.writer.close()
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _host_semaphore(self, url: str) -> threading.Semaphore:
+        """Return the semaphore limiting concurrent requests to a URL's host."""
+        host = urlsplit(url).netloc.lower()
+        with self._host_semaphores_lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.Semaphore(MAX_REQUESTS_PER_HOST)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+
+    @contextmanager
+    def http_get(self, url: str, **kwargs) -> Iterator[requests.Response]:
+        """GET a URL through the shared session, backing off when rate limited.
+
+        Use as a context manager: the host's slot is held until the block
+        exits, so streamed bodies are read within the per-host limit, and the
+        response is closed on exit. At most MAX_REQUESTS_PER_HOST requests
+        run against one host at a time.
+        """
+        with self._host_semaphore(url):
+            response = self._get_with_backoff(url, **kwargs)
+            try:
+                yield response
+            finally:
+                response.close()
+
+    def _get_with_backoff(self, url: str, **kwargs) -> requests.Response:
+        """GET a URL, retrying 429/503 responses.
+
+        The server's Retry-After is honoured, falling back to exponential
+        backoff with jitter. After RATE_LIMIT_RETRIES retries the last
+        response is returned as-is.
+        """
+        for attempt in range(RATE_LIMIT_RETRIES + 1):
+            response = self.session.get(url, **kwargs)
+            if response.status_code not in _RATE_LIMIT_STATUSES:
+                return response
+            if attempt == RATE_LIMIT_RETRIES:
+                logger.warning(f"Giving up on {url} after {attempt} rate-limited retries")
+                return response
+
+            delay = _retry_after_seconds(response)
+            if delay is None:
+                delay = RATE_LIMIT_BASE_DELAY * 2 ** attempt + random.uniform(0, RATE_LIMIT_BASE_DELAY)
+            delay = min(RATE_LIMIT_MAX_DELAY, delay)
+            logger.warning(f"Rate limited by {urlsplit(url).netloc} (HTTP {response.status_code}), retrying in {delay:.1f}s")
+            response.close()
+            time.sleep(delay)
+
     def fetch_feed(self, feed_url: str) -> Optional[feedparser.FeedParserDict]:
         """Fetch and parse an RSS feed."""
         try:
             logger.info(f"Fetching feed: {feed_url}")
-            feed = feedparser.parse(feed_url)
+            # Download through the shared session, as a conditional request when possible
+            # Validators only apply to the day they were recorded for; a new
+            # target day must re-read the feed even if it hasn't changed
+            state = self._feed_state.get(feed_url, {})
+            if state.get('day') != self._yesterday.isoformat():
+                state = {}
+            headers = {}
+            if state.get('etag'):
+                headers['If-None-Match'] = state['etag']
+            if state.get('modified'):
+                headers['If-Modified-Since'] = state['modified']
+            with self.http_get(feed_url, headers=headers, timeout=15) as response:
+                if response.status_code == 304:  # Not modified since the last run
+                    logger.info(f"Feed unchanged: {feed_url}")
+                    return None
+                response.raise_for_status()
+                body = response.content
+
+            # feedparser looks headers up by lower-case name
+            response_headers = {name.lower(): value for name, value in response.headers.items()}
+            # Relative links are resolved against this when parsing bytes instead of a URL
+            response_headers.setdefault('content-location', response.url)
+            feed = feedparser.parse(body, response_headers=response_headers)
             if feed.bozo:  # Feed parsing error
                 logger.error(f"Error parsing feed {feed_url}: {feed.bozo_exception}")
                 return None
+
+            # Keep validators aside; they are recorded once the feed's articles are processed
+            new_state = {
+                key: response.headers[header]
+                for key, header in (('etag', 'ETag'), ('modified', 'Last-Modified'))
+                if response.headers.get(header)
+            }
+            if new_state:
+                new_state['day'] = self._yesterday.isoformat()
+                self._pending_feed_state[feed_url] = new_state
             logger.info(f"Successfully fetched feed with {len(feed.entries)} entries")
             return feed
         except Exception as e:
@@ -104,167 +649,139 @@ class RSSProcessor:
                 logger.warning(f"No link found for article: {article.get('title', 'Unknown title')}")
                 return ""
 
-            logger.info(f"Fetching full article content from: {link}")
-            response = requests.get(link, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1'
-            }, timeout=15)  # Increased timeout
-            response.raise_for_status()
-
-            soup = BeautifulSoup(response.text, 'html.parser')
+            logger.info("Fetching full article content from: %s", link)
+            # Stream the page so oversized responses are cut off at MAX_ARTICLE_BYTES
+            with self.http_get(link, timeout=15, stream=True) as response:  # Increased timeout
+                response.raise_for_status()
+                content_length = int(response.headers.get('Content-Length') or 0)
+                if content_length > MAX_ARTICLE_BYTES:
+                    logger.info("Article page is %d bytes, reading only the first %d", content_length, MAX_ARTICLE_BYTES)
+                body = _read_capped(response, MAX_ARTICLE_BYTES)
+
+            try:
+                document = _parse_document(body, response)
+            except (etree.ParserError, ValueError) as e:
+                logger.warning(f"Could not parse article page {link}: {str(e)}")
+                return _rss_content(article)
             
             # Try to find the main article content using various selectors
             content = None
-            
-            # Common content selectors for news websites
-            selectors = [
-                # Article content selectors
-                ('article', {'class_': 'article-content'}),
-                ('article', {'class_': 'content'}),
-                ('article', {'class_': 'post-content'}),
-                ('article', {'class_': 'entry-content'}),
-                ('article', {'class_': 'article-body'}),
-                ('article', {'class_': 'story-content'}),
-                
-                # Div content selectors
-                ('div', {'class_': 'article-content'}),
-                ('div', {'class_': 'content'}),
-                ('div', {'class_': 'post-content'}),
-                ('div', {'class_': 'entry-content'}),
-                ('div', {'class_': 'article-body'}),
-                ('div', {'class_': 'story-content'}),
-                ('div', {'class_': 'article-text'}),
-                ('div', {'class_': 'article-main'}),
-                ('div', {'class_': 'main-content'}),
-                
-                # Specific RTVDrenthe selectors
-                ('div', {'class_': 'layout-components-group article-content', 'data-v-28650198': ''}),
-                ('div', {'class_': 'layout-components-group article-content'}),
-                
-                # Generic content containers
-                ('main', {}),
-                ('article', {}),
-                ('div', {'id': 'content'}),
-                ('div', {'id': 'article-content'}),
-                ('div', {'id': 'main-content'})
-            ]
-            
-            # Try each selector
-            for tag, attrs in selectors:
-                content = soup.find(tag, attrs)
-                if content:
-                    logger.info(f"Found content using selector: {tag} with {attrs}")
-                    break
-
-            if content:
-                # Remove unwanted elements
-                for element in content.find_all(['script', 'style', 'nav', 'header', 'footer', 'aside', 'iframe', 'noscript', 'form', 'button', 'input', 'select', 'textarea']):
-                    element.decompose()
+            found = _find_content(document)
+            if found:
+                content, tag, attrs = found
+                logger.info("Found content using selector: %s with %s", tag, attrs)
+
+            if content is not None:
+                # Remove unwanted elements, keeping the text that follows them
+                etree.strip_elements(content, *_STRIP_TAGS, with_tail=False)
                 
                 # Remove common non-content elements
-                for class_name in ['advertisement', 'social-share', 'related-articles', 'news-category-list', 'comments', 'sidebar']:
-                    for element in content.find_all(class_=lambda x: x and class_name in x.lower()):
-                        element.decompose()
+                for element in _NON_CONTENT_XPATH(content):
+                    element.drop_tree()
                 
-                # Get all text elements
+                # Get all text elements, counting words as we go
                 text_elements = []
-                for element in content.find_all(['p', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'li', 'div']):
-                    text = element.get_text(strip=True)
-                    if text and len(text) > 10:  # Only include substantial text elements
+                word_count = 0
+                for element in _TEXT_XPATH(content):
+                    text = _WS_RE.sub(' ', element.text_content()).strip()
+                    if len(text) > 10:  # Only include substantial text elements
                         text_elements.append(text)
+                        word_count += text.count(' ') + 1
+                        if MAX_ARTICLE_WORDS and word_count >= MAX_ARTICLE_WORDS:
+                            logger.info("Reached %d words, truncating article text from %s", MAX_ARTICLE_WORDS, link)
+                            break
                 
                 # Join all text elements with proper spacing
                 text_content = ' '.join(text_elements)
                 
-                if text_content and len(text_content.split()) > 50:  # Ensure we have substantial content
-                    logger.info(f"Successfully extracted content from {link} ({len(text_content.split())} words)")
+                if word_count > 50:  # Ensure we have substantial content
+                    logger.info("Successfully extracted content from %s (%d words)", link, word_count)
                     return text_content
                 else:
                     logger.warning(f"Found content container but insufficient text content in {link}")
 
             # If we couldn't find any content, log the HTML structure for debugging
             logger.warning(f"Could not find main content in article: {link}")
-            logger.debug(f"Page structure: {soup.prettify()[:1000]}")  # Log first 1000 chars of HTML
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Page structure: %s", body[:1000].decode('utf-8', errors='replace'))  # Log first 1000 bytes of HTML
 
             # Only fall back to RSS content if we absolutely couldn't get content from the link
-            if 'content' in article:
-                return article.content[0].value
-            elif 'summary' in article:
-                return article.summary
-            elif 'description' in article:
-                return article.description
-
-            return ""
+            return _rss_content(article)
 
         except requests.RequestException as e:
             logger.error(f"Error fetching article content: {str(e)}")
             # Only fall back to RSS content on error
-            if 'content' in article:
-                return article.content[0].value
-            elif 'summary' in article:
-                return article.summary
-            elif 'description' in article:
-                return article.description
-            return ""
+            return _rss_content(article)
         except Exception as e:
             logger.error(f"Error extracting content: {str(e)}")
             return ""
 
     def clean_content(self, content: str) -> str:
         """Clean HTML and normalize content."""
+        # Plain-text content (common for RSS summaries) only needs whitespace
+        # normalized; anything with tags or entities still goes through the parser
+        if '<' not in content and '&' not in content:
+            return _WS_RE.sub(' ', content).strip()
+
         try:
-            soup = BeautifulSoup(content, 'html.parser')
+            soup = _parse_html(content)
             cleaned = soup.get_text(separator=' ', strip=True)
-            logger.debug(f"Cleaned content length: {len(cleaned)} characters")
+            logger.debug("Cleaned content length: %d characters", len(cleaned))
             return cleaned
         except Exception as e:
             logger.error(f"Error cleaning content: {str(e)}")
             return content
 
-    def analyze_content(self, content: str) -> Dict:
-        """Analyze article content based on configuration."""
+    def analyze_content(self, content: str) -> Tuple[Dict, Tuple[int, int, int]]:
+        """Analyze article content based on configuration.
+
+        Returns the analysis along with the sentence, word and unique word
+        counts so callers can reuse them instead of tokenizing the content again.
+        """
         analysis = {}
+        stats = (0, 0, 0)
+
+        try:
+            stats = self.tokenize_content(content)
+        except Exception as e:
+            logger.error(f"Error tokenizing content: {str(e)}")
+            return analysis, stats
         
         if not content or len(content.split()) < MIN_ARTICLE_LENGTH:
             logger.warning(f"Content too short for analysis: {len(content.split())} words")
-            return analysis
+            return analysis, stats
 
         try:
             # Basic text analysis
-            sentences = nltk.sent_tokenize(content)
-            words = nltk.word_tokenize(content)
-            
+            sentence_count, word_count, _ = stats
             analysis['basic_stats'] = {
-                'word_count': len(words),
-                'sentence_count': len(sentences),
-                'avg_words_per_sentence': len(words) / len(sentences) if sentences else 0
+                'word_count': word_count,
+                'sentence_count': sentence_count,
+                'avg_words_per_sentence': word_count / sentence_count if sentence_count else 0
             }
-            logger.debug(f"Basic analysis completed: {analysis['basic_stats']}")
+            logger.debug("Basic analysis completed: %s", analysis['basic_stats'])
 
             # Add more analysis based on ANALYSIS_CONFIG
-            if ANALYSIS_CONFIG['extract_keywords']:
+            if ANALYSIS_CONFIG.extract_keywords:
                 # Implement keyword extraction
                 pass
 
-            if ANALYSIS_CONFIG['summarize_content']:
+            if ANALYSIS_CONFIG.summarize_content:
                 # Implement content summarization
                 pass
 
-            if ANALYSIS_CONFIG['extract_entities']:
+            if ANALYSIS_CONFIG.extract_entities:
                 # Implement named entity recognition
                 pass
 
-            if ANALYSIS_CONFIG['sentiment_analysis']:
+            if ANALYSIS_CONFIG.sentiment_analysis:
                 # Implement sentiment analysis
                 pass
 
-            return analysis
+            return analysis, stats
         except Exception as e:
             logger.error(f"Error in content analysis: {str(e)}")
-            return analysis
+            return analysis, stats
 
     def process_article(self, article: Dict, feed_url: str) -> Optional[Dict]:
         """Process a single article."""
@@ -280,7 +797,7 @@ class RSSProcessor:
                 return None
 
             # Analyze content
-            analysis = self.analyze_content(cleaned_content)
+            analysis, (sentence_count, word_count, unique_words) = self.analyze_content(cleaned_content)
 
             # Create article data structure
             article_data = {
@@ -292,9 +809,9 @@ class RSSProcessor:
                 'analysis': analysis,
                 'metadata': {
                     'processed_date': datetime.now().isoformat(),
-                    'word_count': len(cleaned_content.split()),
-                    'sentence_count': len(nltk.sent_tokenize(cleaned_content)),
-                    'unique_words': len(set(cleaned_content.lower().split())),
+                    'word_count': word_count,
+                    'sentence_count': sentence_count,
+                    'unique_words': unique_words,
                     'language': 'en',  # Could be enhanced with language detection
                     'difficulty_level': 'medium'  # Could be calculated based on content
                 }
@@ -309,48 +826,62 @@ class RSSProcessor:
     def save_article(self, article_data: Dict):
         """Save processed article to storage."""
         try:
-            # Create filename for the combined articles file
-            date_str = datetime.now().strftime('%Y%m%d')
-            filename = f"articles_{date_str}.json"
-            filepath = PROCESSED_ARTICLES_DIR / filename
-            
-            # Load existing articles if file exists
-            existing_articles = []
-            if filepath.exists():
-                with open(filepath, 'r', encoding='utf-8') as f:
+            self.writer.write(article_data)
+            logger.debug("Queued article for: %s", self.writer.path.name)
+        except Exception as e:
+            logger.error(f"Error saving article: {str(e)}")
+
+    def compact(self) -> Optional[Path]:
+        """Write today's JSONL articles as one JSON array for readers that need it."""
+        source = self.writer.path
+        if not source.exists():
+            return None
+
+        try:
+            articles = []
+            with open(source, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
                     try:
-                        existing_articles = json.load(f)
+                        articles.append(_load_line(line))
                     except json.JSONDecodeError:
-                        logger.warning(f"Error reading existing articles file: {filepath}")
-                        existing_articles = []
-            
-            # Add new article to the list
-            existing_articles.append(article_data)
-            
-            # Save all articles back to the file
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(existing_articles, f, ensure_ascii=False, indent=2)
+                        logger.warning(f"Skipping malformed line in {source.name}")
+
+            target = source.with_suffix('.json')
+            if orjson is not None:
+                with open(target, 'wb') as f:
+                    f.write(orjson.dumps(articles, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
+            else:
+                with open(target, 'w', encoding='utf-8') as f:
+                    json.dump(articles, f, ensure_ascii=False, indent=2)
             
-            logger.info(f"Saved article to combined file: {filename}")
+            logger.info(f"Compacted {len(articles)} articles into: {target.name}")
+            return target
         except Exception as e:
-            logger.error(f"Error saving article: {str(e)}")
+            logger.error(f"Error compacting articles: {str(e)}")
+            return None
 
     def cleanup_old_files(self):
-        """Clean up old individual article files if they exist."""
+        """Clean up article files from earlier days, keeping today's compacted copy."""
         try:
-            # Get all JSON files in the processed articles directory
-            json_files = list(PROCESSED_ARTICLES_DIR.glob('*.json'))
-            
-            # Skip the combined articles file
-            date_str = datetime.now().strftime('%Y%m%d')
-            combined_file = PROCESSED_ARTICLES_DIR / f"articles_{date_str}.json"
+            today_files = {self.writer.path}
+            compacted = self.compact()
+            if compacted:
+                today_files.add(compacted)
+
+            # Get all article files in the processed articles directory
+            article_files = [
+                file for file in PROCESSED_ARTICLES_DIR.iterdir()
+                if file.suffix in ('.json', '.jsonl', '.ndjson')
+            ]
             
-            # Delete individual article files
-            for file in json_files:
-                if file != combined_file:
+            # Delete everything except today's articles
+            for file in article_files:
+                if file not in today_files:
                     try:
                         file.unlink()
-                        logger.info(f"Deleted old individual file: {file.name}")
+                        logger.info(f"Deleted old article file: {file.name}")
                     except Exception as e:
                         logger.error(f"Error deleting file {file.name}: {str(e)}")
         except Exception as e:
@@ -361,39 +892,74 @@ class RSSProcessor:
         logger.info("Starting feed processing")
         total_articles_processed = 0
         
-        for feed_url in self.feeds:
-            logger.info(f"Processing feed: {feed_url}")
-            feed = self.fetch_feed(feed_url)
-            
-            if not feed:
-                continue
-
-            articles_processed = 0
-            for entry in feed.entries:
-                if articles_processed >= MAX_ARTICLES_PER_FEED:
-                    logger.info(f"Reached maximum articles limit for feed: {feed_url}")
-                    break
-
-                # Only process articles from yesterday
-                if not self.is_article_from_yesterday(entry):
+        feed_workers = max(1, min(32, len(self.feeds)))
+        # Links already queued in this run, so syndicated stories are fetched once
+        seen_links = set()
+
+        # Feeds download in parallel. Article fetches from every feed share one
+        # pool, and each feed's articles start as soon as that feed arrives
+        with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor, \
+                ThreadPoolExecutor(max_workers=feed_workers) as feed_executor:
+            feed_futures = {feed_executor.submit(self.fetch_feed, feed_url): feed_url for feed_url in self.feeds}
+            pending = []
+            for feed_future in as_completed(feed_futures):
+                feed_url = feed_futures[feed_future]
+                logger.info(f"Processing feed: {feed_url}")
+                feed = feed_future.result()
+                
+                if not feed:
                     continue
 
-                article_data = self.process_article(entry, feed_url)
-                if article_data:
-                    self.save_article(article_data)
-                    articles_processed += 1
-                    total_articles_processed += 1
-
-            logger.info(f"Processed {articles_processed} articles from {feed_url}")
+                # Only process articles from yesterday
+                eligible = []
+                for entry in feed.entries:
+                    if not self.is_article_from_yesterday(entry):
+                        continue
+                    if len(eligible) >= MAX_ARTICLES_PER_FEED:
+                        logger.info(f"Reached maximum articles limit for feed: {feed_url}")
+                        break
+                    link = entry.get('link')
+                    if link:
+                        key = _link_key(link)
+                        if key in seen_links:
+                            logger.info(f"Skipping duplicate article: {link}")
+                            continue
+                        seen_links.add(key)
+                    eligible.append(entry)
+
+                futures = [executor.submit(self.process_article, entry, feed_url) for entry in eligible]
+                pending.append((feed_url, futures))
+
+            # Saving stays on this thread
+            for feed_url, futures in pending:
+                articles_processed = 0
+                for future in futures:
+                    article_data = future.result()
+                    if article_data:
+                        self.save_article(article_data)
+                        articles_processed += 1
+                        total_articles_processed += 1
+
+                logger.info(f"Processed {articles_processed} articles from {feed_url}")
+
+                # Only skip this feed next time if every article made it to storage
+                pending_state = self._pending_feed_state.pop(feed_url, None)
+                if pending_state and articles_processed == len(futures):
+                    self._feed_state[feed_url] = pending_state
+                elif pending_state:
+                    self._feed_state.pop(feed_url, None)
         
-        # Clean up old individual files
+        # Write any buffered articles, then clean up old files
+        self.writer.flush()
         self.cleanup_old_files()
+        self._save_token_cache()
+        self._save_feed_state()
         
         logger.info(f"Total articles processed: {total_articles_processed}")
 
 def main():
-    processor = RSSProcessor()
-    processor.process_feeds()
+    with RSSProcessor() as processor:
+        processor.process_feeds()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file